@@ -27,6 +27,7 @@ import java.util.ArrayDeque;
 import java.util.ArrayList;
 import java.util.Arrays;
 import java.util.Deque;
+import java.util.HashMap;
 import java.util.HashSet;
 import java.util.List;
 import java.util.Map;
@@ -2784,7 +2785,12 @@ public class Minescript {
           }
           List<?> positions = (List<?>) args.get(0);
           World level = player.getEntityWorld();
-          List<String> blocks = new ArrayList<>();
+          // Reply with each distinct block type once plus a per-position index into that palette,
+          // so that block states are converted to strings once and repeated types aren't resent.
+          Map<BlockState, Integer> paletteIds = new HashMap<>();
+          List<String> palette = new ArrayList<>();
+          int[] ids = new int[positions.size()];
+          int numBlocks = 0;
           var pos = new BlockPos.Mutable();
           for (var position : positions) {
             if (!(position instanceof List)) {
@@ -2800,10 +2806,16 @@ public class Minescript {
             int x = ((Number) coords.get(0)).intValue();
             int y = ((Number) coords.get(1)).intValue();
             int z = ((Number) coords.get(2)).intValue();
-            Optional<String> block = blockStateToString(level.getBlockState(pos.set(x, y, z)));
-            blocks.add(block.orElse(null));
+            BlockState blockState = level.getBlockState(pos.set(x, y, z));
+            Integer id = paletteIds.get(blockState);
+            if (id == null) {
+              id = palette.size();
+              paletteIds.put(blockState, id);
+              palette.add(blockStateToString(blockState).orElse(null));
+            }
+            ids[numBlocks++] = id;
           }
-          return Optional.of(GSON.toJson(blocks));
+          return Optional.of(GSON.toJson(Map.of("palette", palette, "ids", ids)));
         }
 
       case "register_chat_message_listener":
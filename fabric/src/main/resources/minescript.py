@@ -15,13 +15,20 @@ Minescript mod.  This module should be imported by other
 scripts and not run directly.
 """
 
-import base64
 import os
+import struct
 import sys
-from array import array
+import threading
+import weakref
 from minescript_runtime import CallScriptFunction, CallAsyncScriptFunction
 from typing import Any, List, Set, Dict, Tuple, Optional, Callable
 
+try:
+  # pybase64 is an optional, SIMD-accelerated drop-in for the base64 module.
+  from pybase64 import b64encode as _b64encode
+except ImportError:
+  from base64 import b64encode as _b64encode
+
 
 def execute(command: str):
   """Executes the given command.
@@ -40,7 +47,9 @@ def execute(command: str):
     return
   if command[0] not in ("/", "\\"):
     command = "/" + command
-  print(command)
+  # Write each line with a single call: print() writes the text and newline separately, which costs
+  # an extra syscall on unbuffered stdout and lets output from other threads land in between.
+  sys.stdout.write(command + "\n")
 
 
 def echo(message: Any):
@@ -50,7 +59,7 @@ def echo(message: Any):
 
   Since: v2.0
   """
-  print(message, file=sys.stderr)
+  sys.stderr.write(str(message) + "\n")
 
 
 def chat(message: str):
@@ -68,7 +77,7 @@ def chat(message: str):
   # the message is printed and not executed as a command.
   if message[0] in ("/", "\\"):
     message = " " + message
-  print(message)
+  sys.stdout.write(message + "\n")
 
 
 def log(message: str) -> bool:
@@ -420,30 +429,50 @@ def player_get_targeted_block(max_distance: float = 20):
   return CallScriptFunction("player_get_targeted_block", max_distance)
 
 
-def players():
+def players(done_callback=None):
   """Gets a list of nearby players and their attributes.
 
+  Args:
+    done_callback: if given, return immediately and call `done_callback(return_value)`
+        asynchronously when `return_value` is ready
+
   Returns:
-    List of players where each player is represented as a dict:
-    `{"name": str, "type": str, "position": [float, float, float], "yaw": float, "pitch": float,
-    "velocity": [float, float, float]}`
+    If `done_callback` is `None`, returns list of players where each player is represented
+    as a dict: `{"name": str, "type": str, "position": [float, float, float], "yaw": float,
+    "pitch": float, "velocity": [float, float, float]}`
+
+  Update in v3.1:
+    Added optional `done_callback` so that scripts can query players without blocking.
 
   Since: v2.1
   """
-  return CallScriptFunction("players")
+  if done_callback is None:
+    return CallScriptFunction("players")
+  else:
+    CallAsyncScriptFunction("players", (), done_callback)
 
 
-def entities():
+def entities(done_callback=None):
   """Gets a list of nearby entities and their attributes.
 
+  Args:
+    done_callback: if given, return immediately and call `done_callback(return_value)`
+        asynchronously when `return_value` is ready
+
   Returns:
-    List of entities where each entity is represented as a dict:
-    `{"name": str, "type": str, "position": [float, float, float], "yaw": float, "pitch": float,
-    "velocity": [float, float, float]}`
+    If `done_callback` is `None`, returns list of entities where each entity is represented
+    as a dict: `{"name": str, "type": str, "position": [float, float, float], "yaw": float,
+    "pitch": float, "velocity": [float, float, float]}`
+
+  Update in v3.1:
+    Added optional `done_callback` so that scripts can query entities without blocking.
 
   Since: v2.1
   """
-  return CallScriptFunction("entities")
+  if done_callback is None:
+    return CallScriptFunction("entities")
+  else:
+    CallAsyncScriptFunction("entities", (), done_callback)
 
 
 def getblock(x: int, y: int, z: int, done_callback=None):
@@ -475,9 +504,19 @@ def getblocklist(positions: List[List[int]], done_callback=None):
   Since: v2.1
   """
   if done_callback is None:
-    return CallScriptFunction("getblocklist", positions)
+    return _expand_block_list(CallScriptFunction("getblocklist", positions))
   else:
-    CallAsyncScriptFunction("getblocklist", (positions,), done_callback)
+    CallAsyncScriptFunction(
+        "getblocklist", (positions,), lambda result: done_callback(_expand_block_list(result)))
+
+
+# getblocklist replies with {"palette": [block_type, ...], "ids": [palette_index, ...]} so that
+# repeated block types are sent only once. Expands the reply to one block type per position.
+def _expand_block_list(result):
+  if result is None:
+    return None
+  palette = result["palette"]
+  return [palette[i] for i in result["ids"]]
 
 
 def await_loaded_region(x1: int, z1: int, x2: int, z2: int, done_callback=None):
@@ -657,12 +696,47 @@ class Rotations:
   """Invert the z coordinate (multiply by -1)."""
 
 
+_IDENTITY_ROTATION = Rotations.IDENTITY
+
+# Inverses of the stock rotations, so that undoing a rotation needs no arithmetic.
+_ROTATION_INVERSES: Dict[Rotation, Rotation] = {
+    Rotations.IDENTITY: Rotations.IDENTITY,
+    Rotations.X_90: Rotations.X_270,
+    Rotations.X_180: Rotations.X_180,
+    Rotations.X_270: Rotations.X_90,
+    Rotations.Y_90: Rotations.Y_270,
+    Rotations.Y_180: Rotations.Y_180,
+    Rotations.Y_270: Rotations.Y_90,
+    Rotations.Z_90: Rotations.Z_270,
+    Rotations.Z_180: Rotations.Z_180,
+    Rotations.Z_270: Rotations.Z_90,
+    Rotations.INVERT_X: Rotations.INVERT_X,
+    Rotations.INVERT_Y: Rotations.INVERT_Y,
+    Rotations.INVERT_Z: Rotations.INVERT_Z,
+}
+
+
+# Returns True if rotation is None or equal to Rotations.IDENTITY.
+def _is_identity_rotation(rotation: Rotation) -> bool:
+  return rotation is None or rotation is _IDENTITY_ROTATION or rotation == _IDENTITY_ROTATION
+
+
 # TODO(maxuser): Move this into Rotations class and rename to compose(...).
 def combine_rotations(rot1: Rotation, rot2: Rotation, /) -> Rotation:
   """Combines two rotation matrices into a single rotation matrix.
 
   Since: v3.0
   """
+  # Composing with the identity rotation is common and needs no arithmetic. The other rotation is
+  # returned as is only if it's a tuple, so that the result is never a caller's mutable list.
+  if rot1 is _IDENTITY_ROTATION or rot1 == _IDENTITY_ROTATION:
+    return rot2 if type(rot2) is tuple else tuple(rot2)
+  if rot2 is _IDENTITY_ROTATION or rot2 == _IDENTITY_ROTATION:
+    return rot1 if type(rot1) is tuple else tuple(rot1)
+  if type(rot1) is tuple:
+    inverse = _ROTATION_INVERSES.get(rot1)
+    if inverse is not None and (inverse is rot2 or inverse == rot2):
+      return _IDENTITY_ROTATION
   return (
       rot1[0] * rot2[0] + rot1[1] * rot2[3] + rot1[2] * rot2[6],
       rot1[0] * rot2[1] + rot1[1] * rot2[4] + rot1[2] * rot2[7],
@@ -678,7 +752,7 @@ def combine_rotations(rot1: Rotation, rot2: Rotation, /) -> Rotation:
 def blockpack_read_world(
     pos1: BlockPos, pos2: BlockPos,
     rotation: Rotation = None, offset: BlockPos = None,
-    comments: Dict[str, str] = {}, safety_limit: bool = True) -> int:
+    comments: Dict[str, str] = {}, safety_limit: bool = True, done_callback=None) -> int:
   """Creates a blockpack from blocks in the world within a rectangular volume.
 
   For a more user-friendly API, use the `BlockPack` class instead. (__internal__)
@@ -689,14 +763,28 @@ def blockpack_read_world(
     offset: offset to apply to block coordiantes (applied after rotation)
     comments: key, value pairs to include in the new blockpack
     safety_limit: if `True`, fail if requested volume spans more than 1600 chunks
+    done_callback: if given, return immediately and call `done_callback(return_value)`
+        asynchronously when `return_value` is ready
 
   Returns:
-    an int id associated with a new blockpack upon success, `None` otherwise
+    if `done_callback` is `None`, returns an int id associated with a new blockpack upon
+    success, `None` otherwise
+
+  Update in v3.1:
+    Added optional `done_callback` so that scripts can issue reads of several volumes without
+    waiting on each in turn.
 
   Since: v3.0
   """
-  return CallScriptFunction(
-      "blockpack_read_world", pos1, pos2, rotation, offset, comments, safety_limit)
+  if _is_identity_rotation(rotation):
+    rotation = None
+  if done_callback is None:
+    return CallScriptFunction(
+        "blockpack_read_world", pos1, pos2, rotation, offset, comments, safety_limit)
+  else:
+    CallAsyncScriptFunction(
+        "blockpack_read_world", (pos1, pos2, rotation, offset, comments, safety_limit),
+        done_callback)
 
 
 def blockpack_read_file(filename: str) -> int:
@@ -768,6 +856,8 @@ def blockpack_write_world(
 
   Since: v3.0
   """
+  if _is_identity_rotation(rotation):
+    rotation = None
   return CallScriptFunction("blockpack_write_world", blockpack_id, rotation, offset)
 
 
@@ -836,7 +926,7 @@ def blockpacker_create() -> int:
 
 def blockpacker_add_blocks(
     blockpacker_id: int, offset: BlockPos,
-    base64_setblocks: str, base64_fills: str, blocks: List[str]) -> bool:
+    base64_setblocks: str, base64_fills: str, blocks: List[str], done_callback=None) -> bool:
   """Adds blocks from setblocks and fills arrays to a currently loaded blockpacker.
 
   For a more user-friendly API, use the `BlockPacker` class instead. (__internal__)
@@ -849,14 +939,21 @@ def blockpacker_add_blocks(
     base64_fills: base64-encoded array of 16-bit signed ints where every 7 values are:
       x1, y1, z1, x2, y2, z2 relative to `offset` and index into `blocks` list
     blocks: types of blocks referenced from `base64_setblocks` and `base64_fills` arrays
+    done_callback: if given, return immediately and call `done_callback(return_value)`
+        asynchronously when `return_value` is ready
 
   Returns:
-    `True` upon success
+    if `done_callback` is `None`, returns `True` upon success
 
   Since: v3.1
   """
-  return CallScriptFunction(
-      "blockpacker_add_blocks", blockpacker_id, offset, base64_setblocks, base64_fills, blocks)
+  if done_callback is None:
+    return CallScriptFunction(
+        "blockpacker_add_blocks", blockpacker_id, offset, base64_setblocks, base64_fills, blocks)
+  else:
+    CallAsyncScriptFunction(
+        "blockpacker_add_blocks", (blockpacker_id, offset, base64_setblocks, base64_fills, blocks),
+        done_callback)
 
 
 def blockpacker_add_blockpack(
@@ -877,6 +974,8 @@ def blockpacker_add_blockpack(
 
   Since: v3.0
   """
+  if _is_identity_rotation(rotation):
+    rotation = None
   return CallScriptFunction(
       "blockpacker_add_blockpack", blockpacker_id, blockpack_id, rotation, offset)
 
@@ -918,6 +1017,14 @@ class BlockPackException(Exception):
   pass
 
 
+_BLOCKPACKS_DIR = os.path.join("minescript", "blockpacks")
+
+
+# Frees a blockpack without waiting for a response. Failures are logged by the Minescript runtime.
+def _release_blockpack(blockpack_id: int):
+  CallAsyncScriptFunction("blockpack_delete", (blockpack_id,), lambda ok: None)
+
+
 class BlockPack:
   """BlockPack is an immutable and serializable collection of blocks.
 
@@ -931,6 +1038,8 @@ class BlockPack:
   Since: v3.0
   """
 
+  __slots__ = ("_id", "__weakref__")
+
   def __init__(self, java_generated_id: int):
     """Do not call the constructor directly. Use factory classmethods instead.
 
@@ -938,6 +1047,14 @@ class BlockPack:
     """
     self._id = java_generated_id
 
+    # A finalizer frees the blockpack without waiting for a response, whereas __del__ would make a
+    # blocking blockpack_delete call from within garbage collection: that call deadlocks if
+    # collection runs on the runtime's thread that delivers responses, and any exception it raises
+    # is only reported as "Exception ignored". Skip it at exit because Minescript frees a job's
+    # blockpacks when the job exits.
+    finalizer = weakref.finalize(self, _release_blockpack, java_generated_id)
+    finalizer.atexit = False
+
   @classmethod
   def read_world(
       cls,
@@ -980,8 +1097,8 @@ class BlockPack:
     Raises:
       `BlockPackException` if blockpack cannot be read
     """
-    if not os.path.isabs(filename) and not relative_to_cwd:
-      filename = os.path.join("minescript", "blockpacks", filename)
+    if not relative_to_cwd and not os.path.isabs(filename):
+      filename = _BLOCKPACKS_DIR + os.sep + filename
     blockpack_id = blockpack_read_file(filename)
     if blockpack_id is None:
       raise BlockPackException()
@@ -1057,8 +1174,8 @@ class BlockPack:
     Raises:
       `BlockPackException` if blockpack operation fails
     """
-    if not os.path.isabs(filename) and not relative_to_cwd:
-      filename = os.path.join("minescript", "blockpacks", filename)
+    if not relative_to_cwd and not os.path.isabs(filename):
+      filename = _BLOCKPACKS_DIR + os.sep + filename
     if not blockpack_write_file(self._id, filename):
       raise BlockPackException()
 
@@ -1078,29 +1195,32 @@ class BlockPack:
     return base64_str
 
 
-  def __del__(self):
-    """Frees this BlockPack to be garbage collected.
-
-    Raises:
-      `BlockPackException` if blockpack operation fails
-    """
-    if not blockpack_delete(self._id):
-      raise BlockPackException()
-
-
 class BlockPackerException(Exception):
   pass
 
 
-def _pos_subtract(pos1: BlockPos, pos2: BlockPos) -> BlockPos:
-  """Returns pos1 minus pos2."""
-  return (pos1[0] - pos2[0], pos1[1] - pos2[1], pos1[2] - pos2[2])
-
+# Maximum number of flushes from a BlockPacker that may await a response. Flushes don't wait for a
+# response, and Minescript queues a job's script function calls without limit, so this bounds
+# the memory and per-tick work taken up by a script that adds blocks faster than they're processed.
+_MAX_PENDING_FLUSHES = 2
 
-_SETBLOCKS_ARRAY_THRESHOLD = 4000
-_FILLS_ARRAY_THRESHOLD = 7000
+# Flush thresholds for setblocks and fills, in bytes. Larger flushes mean fewer script function
+# calls, but all pending flushes may be processed within a single tick, so a tick adds at most
+# _MAX_PENDING_FLUSHES times these: 4096 setblocks (8 bytes each) or 2340 fills (14 bytes each).
+_SETBLOCKS_BUFFER_THRESHOLD = 16384
+_FILLS_BUFFER_THRESHOLD = 16384
 _BLOCKS_DICT_THRESHOLD = 1000
 
+# Setblocks and fills are packed as big-endian 16-bit ints, the byte order that Java's BlockPacker
+# decodes, so buffers can be sent as-is without a byte-swapping pass on little-endian hosts.
+_pack_setblock = struct.Struct(">hhhh").pack
+_pack_fill = struct.Struct(">hhhhhhh").pack
+
+
+# Frees a blockpacker without waiting for a response. Failures are logged by the Minescript runtime.
+def _release_blockpacker(blockpacker_id: int):
+  CallAsyncScriptFunction("blockpacker_delete", (blockpacker_id,), lambda ok: None)
+
 class BlockPacker:
   """BlockPacker is a mutable collection of blocks.
 
@@ -1116,17 +1236,26 @@ class BlockPacker:
   Since: v3.0
   """
 
+  __slots__ = (
+      "_id", "offset", "setblocks", "fills", "blocks", "_add_blocks_failed", "_pending_flushes",
+      "_flush_done", "__weakref__")
+
   def __init__(self):
     """Creates a new, empty blockpacker."""
 
     self._id = blockpacker_create()
     self.offset = None # offset for 16-bit positions recorded in setblocks and fills
-    self.setblocks = array("h")
-    self.fills = array("h")
+    self.setblocks = bytearray()
+    self.fills = bytearray()
     self.blocks: Dict[str, int] = dict()
+    self._add_blocks_failed = False
+    self._pending_flushes = 0
+    self._flush_done = threading.Condition()
 
-  def _get_block_id(self, block_type: str) -> int:
-    return self.blocks.setdefault(block_type, len(self.blocks))
+    # A finalizer rather than __del__ for the same reasons as in BlockPack.__init__, with
+    # blockpacker_delete in place of blockpack_delete.
+    finalizer = weakref.finalize(self, _release_blockpacker, self._id)
+    finalizer.atexit = False
 
   def setblock(self, pos: BlockPos, block_type: str):
     """Sets a block within this BlockPacker.
@@ -1136,24 +1265,82 @@ class BlockPacker:
       block_type: block descriptor to set
 
     Raises:
-      `BlockPackerException` if blockpacker operation fails
+      `BlockPackerException` if blockpacker operation fails. Blocks are sent to Minecraft in
+      batches without waiting for a response, so a failure to add them is raised by `pack()`.
     """
-    if self.offset is None:
-      self.offset = pos
-
-    relative_pos = _pos_subtract(pos, self.offset)
-    if max(relative_pos) > 32767 or min(relative_pos) < -32768:
-      echo(
-          f"Blocks within a Python-generated BlockPacker cannot span more than 32,767 blocks: "
-          f"{self.offset} -> {pos}")
-      raise BlockPackerException()
+    # Attributes are read into locals and position arithmetic is inlined because this runs once
+    # per block.
+    offset = self.offset
+    if offset is None:
+      offset = self.offset = pos
+    ox, oy, oz = offset
+    x, y, z = pos[0] - ox, pos[1] - oy, pos[2] - oz
+
+    # Block ids are indices into the palette of block types, assigned in order of first use. The
+    # lookup is inlined because setdefault() would compute len(palette) on every call.
+    palette = self.blocks
+    block_id = palette.get(block_type)
+    if block_id is None:
+      block_id = palette[block_type] = len(palette)
+
+    # Packing into signed 16-bit ints range-checks the coordinates in C, so the slower check that
+    # reports which position is out of range runs only when packing fails. Packing in-range
+    # coordinates fails only if they aren't ints.
+    setblocks = self.setblocks
+    try:
+      setblocks += _pack_setblock(x, y, z, block_id)
+    except struct.error as e:
+      self._check_span(pos)
+      raise TypeError(f"Block positions must be ints: {pos}") from e
+
+    # Block ids are assigned sequentially and an oversized palette is flushed immediately, so the
+    # palette exceeds its threshold exactly when the id just returned reaches that threshold.
+    if len(setblocks) > _SETBLOCKS_BUFFER_THRESHOLD or block_id >= _BLOCKS_DICT_THRESHOLD:
+      self._flush_blocks()
 
-    self.setblocks.extend(relative_pos)
-    self.setblocks.append(self._get_block_id(block_type))
+  def setblock_many(self, blocks: List[Tuple[BlockPos, str]]):
+    """Sets multiple blocks within this BlockPacker.
 
-    if (len(self.setblocks) > _SETBLOCKS_ARRAY_THRESHOLD or
-        len(self.blocks) > _BLOCKS_DICT_THRESHOLD):
-      self._flush_blocks()
+    Equivalent to calling `setblock(pos, block_type)` for each block, but with
+    less per-block overhead.
+
+    Args:
+      blocks: list of (pos, block_type) tuples, where pos is the position of a
+        block to set and block_type is the block descriptor to set
+
+    Raises:
+      `BlockPackerException` if blockpacker operation fails. Blocks are sent to Minecraft in
+      batches without waiting for a response, so a failure to add them is raised by `pack()`.
+
+    Since: v3.1
+    """
+    # Same as setblock(), with attribute lookups hoisted out of the loop. The offset is re-read only
+    # when a flush resets it.
+    palette = self.blocks
+    palette_get = palette.get
+    setblocks = self.setblocks
+    offset = self.offset
+    if offset is not None:
+      ox, oy, oz = offset
+
+    for pos, block_type in blocks:
+      if offset is None:
+        offset = self.offset = pos
+        ox, oy, oz = offset
+
+      block_id = palette_get(block_type)
+      if block_id is None:
+        block_id = palette[block_type] = len(palette)
+
+      try:
+        setblocks += _pack_setblock(pos[0] - ox, pos[1] - oy, pos[2] - oz, block_id)
+      except struct.error as e:
+        self._check_span(pos)
+        raise TypeError(f"Block positions must be ints: {pos}") from e
+
+      if len(setblocks) > _SETBLOCKS_BUFFER_THRESHOLD or block_id >= _BLOCKS_DICT_THRESHOLD:
+        self._flush_blocks()
+        offset = None
 
   def fill(self, pos1: BlockPos, pos2: BlockPos, block_type: str):
     """Fills blocks within this BlockPacker.
@@ -1163,52 +1350,124 @@ class BlockPacker:
       block_type: block descriptor to fill
 
     Raises:
-      `BlockPackerException` if blockpacker operation fails
+      `BlockPackerException` if blockpacker operation fails. Blocks are sent to Minecraft in
+      batches without waiting for a response, so a failure to add them is raised by `pack()`.
     """
-    if self.offset is None:
-      self.offset = pos1
-
-    relative_pos1 = _pos_subtract(pos1, self.offset)
-    if max(relative_pos1) > 32767 or min(relative_pos1) < -32768:
-      echo(
-          f"Blocks within a Python-generated BlockPacker cannot span more than 32,767 blocks: "
-          f"{self.offset} -> {pos1}")
-      raise BlockPackerException()
+    offset = self.offset
+    if offset is None:
+      offset = self.offset = pos1
+    ox, oy, oz = offset
+    x1, y1, z1 = pos1[0] - ox, pos1[1] - oy, pos1[2] - oz
+    x2, y2, z2 = pos2[0] - ox, pos2[1] - oy, pos2[2] - oz
+
+    palette = self.blocks
+    block_id = palette.get(block_type)
+    if block_id is None:
+      block_id = palette[block_type] = len(palette)
+
+    fills = self.fills
+    try:
+      fills += _pack_fill(x1, y1, z1, x2, y2, z2, block_id)
+    except struct.error as e:
+      self._check_span(pos1, pos2)
+      raise TypeError(f"Block positions must be ints: {pos1}, {pos2}") from e
+
+    if len(fills) > _FILLS_BUFFER_THRESHOLD or block_id >= _BLOCKS_DICT_THRESHOLD:
+      self._flush_blocks()
 
-    relative_pos2 = _pos_subtract(pos2, self.offset)
-    if max(relative_pos2) > 32767 or min(relative_pos2) < -32768:
-      echo(
-          f"Blocks within a Python-generated BlockPacker cannot span more than 32,767 blocks: "
-          f"{self.offset} -> {pos2}")
-      raise BlockPackerException()
+  def fill_many(self, volumes: List[Tuple[BlockPos, BlockPos, str]]):
+    """Fills multiple volumes within this BlockPacker.
 
-    self.fills.extend(relative_pos1)
-    self.fills.extend(relative_pos2)
-    self.fills.append(self._get_block_id(block_type))
+    Equivalent to calling `fill(pos1, pos2, block_type)` for each volume, but
+    with less per-volume overhead.
 
-    if (len(self.fills) > _FILLS_ARRAY_THRESHOLD or
-        len(self.blocks) > _BLOCKS_DICT_THRESHOLD):
-      self._flush_blocks()
+    Args:
+      volumes: list of (pos1, pos2, block_type) tuples, where pos1 and pos2 are
+        coordinates of opposing corners of a rectangular volume to fill and
+        block_type is the block descriptor to fill it with
 
-  def _flush_blocks(self):
-    if sys.byteorder != "big":
-      # Swap to network (big-endian) byte order.
-      self.setblocks.byteswap()
-      self.fills.byteswap()
+    Raises:
+      `BlockPackerException` if blockpacker operation fails. Blocks are sent to Minecraft in
+      batches without waiting for a response, so a failure to add them is raised by `pack()`.
 
-    ok = blockpacker_add_blocks(
+    Since: v3.1
+    """
+    # Same as fill(), with attribute lookups hoisted out of the loop. The offset is re-read only
+    # when a flush resets it.
+    palette = self.blocks
+    palette_get = palette.get
+    fills = self.fills
+    offset = self.offset
+    if offset is not None:
+      ox, oy, oz = offset
+
+    for pos1, pos2, block_type in volumes:
+      if offset is None:
+        offset = self.offset = pos1
+        ox, oy, oz = offset
+
+      x1, y1, z1 = pos1[0] - ox, pos1[1] - oy, pos1[2] - oz
+      x2, y2, z2 = pos2[0] - ox, pos2[1] - oy, pos2[2] - oz
+
+      block_id = palette_get(block_type)
+      if block_id is None:
+        block_id = palette[block_type] = len(palette)
+
+      try:
+        fills += _pack_fill(x1, y1, z1, x2, y2, z2, block_id)
+      except struct.error as e:
+        self._check_span(pos1, pos2)
+        raise TypeError(f"Block positions must be ints: {pos1}, {pos2}") from e
+
+      if len(fills) > _FILLS_BUFFER_THRESHOLD or block_id >= _BLOCKS_DICT_THRESHOLD:
+        self._flush_blocks()
+        offset = None
+
+  # Echoes an error and raises BlockPackerException if any of positions is too far from the
+  # offset to be stored as 16-bit coordinates.
+  def _check_span(self, *positions: BlockPos):
+    ox, oy, oz = self.offset
+    for pos in positions:
+      if not (-32768 <= pos[0] - ox <= 32767 and
+              -32768 <= pos[1] - oy <= 32767 and
+              -32768 <= pos[2] - oz <= 32767):
+        echo(
+            f"Blocks within a Python-generated BlockPacker cannot span more than 32,767 blocks: "
+            f"{self.offset} -> {pos}")
+        raise BlockPackerException()
+
+  def _flush_blocks(self):
+    # Buffers are already in network (big-endian) byte order, so encode them in place.
+    #
+    # Blocks are sent without waiting for a response because script functions from a given job
+    # are processed in order. A failure is therefore reported before the response to any later
+    # call, and is raised from pack(). Once _MAX_PENDING_FLUSHES flushes are outstanding, wait for
+    # one of them to complete before sending another.
+    with self._flush_done:
+      while self._pending_flushes >= _MAX_PENDING_FLUSHES:
+        self._flush_done.wait()
+      self._pending_flushes += 1
+
+    blockpacker_add_blocks(
         self._id, self.offset,
-        base64.b64encode(self.setblocks.tobytes()).decode("utf-8"),
-        base64.b64encode(self.fills.tobytes()).decode("utf-8"),
-        list(self.blocks.keys()))
+        _b64encode(self.setblocks).decode("utf-8"),
+        _b64encode(self.fills).decode("utf-8"),
+        list(self.blocks),
+        self._on_blocks_added)
 
+    # Buffers are cleared in place so that callers may hold references to them across flushes.
     self.offset = None
-    self.setblocks = array("h")
-    self.fills = array("h")
-    self.blocks = dict()
-
-    if not ok:
-      raise BlockPackerException()
+    self.setblocks.clear()
+    self.fills.clear()
+    self.blocks.clear()
+
+  # Called from the Minescript runtime's thread that receives responses to script functions.
+  def _on_blocks_added(self, ok: bool):
+    with self._flush_done:
+      if not ok:
+        self._add_blocks_failed = True
+      self._pending_flushes -= 1
+      self._flush_done.notify()
 
   def add_blockpack(
       self, blockpack: BlockPack, *, rotation: Rotation = None, offset: BlockPos = None):
@@ -1238,14 +1497,8 @@ class BlockPacker:
       `BlockPackerException` if blockpacker operation fails
     """
     self._flush_blocks()
-    return BlockPack(blockpacker_pack(self._id, comments))
-
-  def __del__(self):
-    """Frees this BlockPacker to be garbage collected.
-
-    Raises:
-      `BlockPackerException` if blockpacker operation fails
-    """
-    if not blockpacker_delete(self._id):
+    blockpack = BlockPack(blockpacker_pack(self._id, comments))
+    if self._add_blocks_failed:
       raise BlockPackerException()
+    return blockpack
 
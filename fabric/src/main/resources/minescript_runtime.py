@@ -28,6 +28,7 @@ CallAsyncScriptFunction(func_name, retval_handler):
   retval_handler(value) is specific to each function.
 """
 
+import itertools
 import json
 import os
 import re
@@ -44,6 +45,10 @@ StringConsumer = Callable[[str], None]
 # Dict values: (function_name: str, on_value_handler: StringConsumer)
 _script_function_calls: Dict[int, Tuple[str, StringConsumer]] = dict()
 
+# Function call IDs are assigned locally so that issuing a call never waits on the clock or on
+# the Minescript runtime. fcid zero is reserved for system management, so start at 1.
+_next_func_call_id = itertools.count(1)
+
 
 def CallAsyncScriptFunction(func_name: str, args: Tuple[Any, ...],
                             retval_handler: StringConsumer) -> None:
@@ -53,9 +58,10 @@ def CallAsyncScriptFunction(func_name: str, args: Tuple[Any, ...],
     func_name: name of Minescript function to call
     retval_handler: callback invoked for each return value
   """
-  func_call_id = time.time_ns()
+  func_call_id = next(_next_func_call_id)
   _script_function_calls[func_call_id] = (func_name, retval_handler)
-  print(f"?{func_call_id} {func_name} {json.dumps(args)}")
+  # Write the request with a single call so that requests from concurrent threads don't interleave.
+  sys.stdout.write(f"?{func_call_id} {func_name} {json.dumps(args)}\n")
 
 
 def CallScriptFunction(func_name: str, *args: Any) -> Any:
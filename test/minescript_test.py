@@ -73,6 +73,22 @@ def ExpectMessage(message):
   raise TestFailure(f'Message not found: {repr(message)}')
   return False
 
+def ExpectBlocks(positions, block_types):
+  # Blocks are written to the world by commands that take effect asynchronously, so poll until they
+  # appear. Only block names are compared because the game may update block properties.
+  timeout = time.time() + 10
+  while True:
+    mismatches = [
+        (pos, expected, actual)
+        for pos, expected, actual in zip(positions, block_types, minescript.getblocklist(positions))
+        if actual.split("[")[0] != expected.split("[")[0]]
+    if not mismatches:
+      PrintSuccess(f"Found {len(positions)} expected blocks")
+      return True
+    if time.time() > timeout:
+      raise TestFailure(f"{len(mismatches)} unexpected blocks, first: {mismatches[0]}")
+    time.sleep(0.5)
+
 def ChatCallback(message):
   message_lock_.acquire()
   messages_.append(message)
@@ -266,6 +282,67 @@ def player_targeted_block_test():
 
 all_tests.append(player_targeted_block_test)
 
+
+def combine_rotations_test():
+  rotations = minescript.Rotations
+  ExpectEqual(minescript.combine_rotations(rotations.IDENTITY, rotations.X_90), rotations.X_90)
+  ExpectEqual(minescript.combine_rotations(rotations.Y_90, rotations.IDENTITY), rotations.Y_90)
+  ExpectEqual(minescript.combine_rotations(rotations.X_90, rotations.X_90), rotations.X_180)
+  ExpectEqual(minescript.combine_rotations(rotations.Z_90, rotations.Z_270), rotations.IDENTITY)
+  ExpectEqual(
+      minescript.combine_rotations(rotations.INVERT_Y, rotations.INVERT_Y), rotations.IDENTITY)
+  ExpectEqual(
+      minescript.combine_rotations(rotations.Y_90, rotations.Z_90), (0, 0, 1, -1, 0, 0, 0, -1, 0))
+
+all_tests.append(combine_rotations_test)
+
+
+def blockpacker_test():
+  x, y, z = [int(p) for p in minescript.player_position()]
+  x0, y0, z0 = x + 2, y + 10, z + 2
+  width = 40
+
+  # Enough single-block volumes that fill_many() flushes partway through and resets its offset.
+  num_fills = minescript._FILLS_BUFFER_THRESHOLD // 14 + width
+  positions = [[x0 + i % width, y0, z0 + i // width] for i in range(num_fills)]
+  block_types = ["minecraft:stone" if i % 2 else "minecraft:dirt" for i in range(num_fills)]
+  blockpacker = minescript.BlockPacker()
+  blockpacker.fill_many(
+      [(pos, pos, block_type) for pos, block_type in zip(positions, block_types)])
+  blockpacker.pack().write_world()
+  ExpectBlocks(positions, block_types)
+
+  # Enough blocks that setblock_many() flushes partway through.
+  num_setblocks = minescript._SETBLOCKS_BUFFER_THRESHOLD // 8 + width
+  setblock_positions = [[x0 + i % width, y0 + 1, z0 + i // width] for i in range(num_setblocks)]
+  setblock_types = ["minecraft:dirt" if i % 2 else "minecraft:stone" for i in range(num_setblocks)]
+
+  # More distinct block types than fit in one flush. Listing a note block's properties in different
+  # orders gives distinct block type strings.
+  note_block_types = []
+  for instrument in ("harp", "basedrum", "snare", "hat", "bass", "flute", "bell", "guitar"):
+    for note in range(25):
+      for powered in ("false", "true"):
+        props = [f"instrument={instrument}", f"note={note}", f"powered={powered}"]
+        for i in range(3):
+          note_block_types.append(f"minecraft:note_block[{','.join(props[i:] + props[:i])}]")
+  ExpectTrue(len(note_block_types) > minescript._BLOCKS_DICT_THRESHOLD)
+  note_block_positions = [
+      [x0 + i % width, y0 + 2, z0 + i // width] for i in range(len(note_block_types))]
+
+  blockpacker = minescript.BlockPacker()
+  blockpacker.setblock_many(list(zip(setblock_positions, setblock_types)))
+  blockpacker.setblock_many(list(zip(note_block_positions, note_block_types)))
+  blockpacker.pack().write_world()
+  ExpectBlocks(setblock_positions + note_block_positions, setblock_types + note_block_types)
+
+  max_z = max(pos[2] for pos in positions + setblock_positions + note_block_positions)
+  blockpacker = minescript.BlockPacker()
+  blockpacker.fill([x0, y0, z0], [x0 + width - 1, y0 + 2, max_z], "minecraft:air")
+  blockpacker.pack().write_world()
+
+all_tests.append(blockpacker_test)
+
 if "--list" in sys.argv[1:]:
   for test in all_tests:
     minescript.chat(f'|{{"text":"{test.__name__}","color":"green"}}')